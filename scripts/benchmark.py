@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch image processing with and without source prefetching.
+
+Generates a set of source images in a temporary directory and processes them
+with process_batch, once loading synchronously and once with a prefetch
+queue. With --latency every file load is delayed to simulate slow storage
+such as spinning disks or network shares.
+
+Usage (from the repository root):
+    python -m scripts.benchmark [--count 16] [--latency 50] [--depth 2]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+import wallpaper_py.image as image_module
+from wallpaper_py.desktop_protocol import ImageMode
+from wallpaper_py.loader import (
+    LOADERS,
+    LoadStrategy,
+    Loader,
+    PrefetchOptions,
+    prefetch,
+)
+
+
+def generate_sources(directory: Path, count: int, size: tuple[int, int]) -> list[Path]:
+    """Write `count` noise JPEGs of the given size into `directory`."""
+    paths = []
+    for index in range(count):
+        path = directory / f"source_{index:03}.jpg"
+        Image.effect_noise(size, 64 + index).convert("RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def simulated_storage(loader: Loader, latency: float) -> Loader:
+    """Wrap a loader so that every load waits `latency` seconds first."""
+
+    def load(path: Path) -> bytes:
+        time.sleep(latency)
+        return loader(path)
+
+    return load
+
+
+def run(paths: list[Path], depth: int, loader: Loader) -> float:
+    """Process all paths and return the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    sources = prefetch(paths, PrefetchOptions(depth, loader=loader))
+    for _ in image_module.process_batch(sources, 1280, 720, ImageMode.FILL):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=16, help="Number of images")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated storage latency per file in milliseconds (default: 0)",
+    )
+    parser.add_argument("--depth", type=int, default=2, help="Prefetch depth")
+    parser.add_argument(
+        "--strategy",
+        type=LoadStrategy,
+        choices=list(LoadStrategy),
+        default=LoadStrategy.READ,
+        help="How source files are read (default: read)",
+    )
+    args = parser.parse_args()
+
+    loader = LOADERS[args.strategy]
+    if args.latency > 0:
+        loader = simulated_storage(loader, args.latency / 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        image_module.DESTINATION = directory / "processed"
+        image_module.DESTINATION.mkdir()
+        paths = generate_sources(directory, args.count, (1920, 1200))
+
+        sequential = run(paths, 0, loader)
+        prefetched = run(paths, args.depth, loader)
+
+    print(f"Images: {args.count}, simulated latency: {args.latency} ms")
+    print(f"Sequential:            {sequential:.3f} s")
+    print(f"Prefetch (depth {args.depth}):   {prefetched:.3f} s")
+    print(f"Speedup:               {sequential / prefetched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Test doubles for the desktop protocol."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+from wallpaper_py.desktop_protocol import (
+    Color,
+    DesktopManager,
+    ImageMode,
+    Monitor,
+    MonitorDescription,
+    Rectangle,
+    WallpaperSettings,
+)
+
+Call = tuple[object, ...]
+
+
+@dataclass
+class FakeMonitorDescription(MonitorDescription):
+    rect: Rectangle
+
+
+@dataclass
+class FakeMonitor(Monitor):
+    monitor_description: FakeMonitorDescription
+    wallpaper_settings: WallpaperSettings
+
+
+def make_monitor(x: int, width: int, height: int, wallpaper: Path) -> FakeMonitor:
+    return FakeMonitor(
+        FakeMonitorDescription(Rectangle(x, 0, x + width, height)),
+        WallpaperSettings(wallpaper),
+    )
+
+
+@dataclass
+class FakeDesktopManager(DesktopManager):
+    """Records every call; modes are per monitor only if `per_monitor`."""
+
+    monitors: list[FakeMonitor] = field(default_factory=list)
+    per_monitor: bool = False
+    mode: ImageMode = ImageMode.FILL
+    background: Color = (0, 0, 0)
+    calls: list[Call] = field(default_factory=list)
+
+    def get_monitors(self) -> Sequence[Monitor]:
+        return self.monitors
+
+    def set_wallpaper(
+        self,
+        monitor_description: MonitorDescription,
+        wallpaper: Path,
+        *,
+        mode: Optional[ImageMode] = None,
+    ) -> None:
+        self.calls.append(("wallpaper", monitor_description, wallpaper, mode))
+
+    def get_supported_modes(self) -> Iterable[ImageMode]:
+        return tuple(ImageMode)
+
+    def is_mode_per_monitor_supported(self) -> bool:
+        return self.per_monitor
+
+    def set_global_mode(self, mode: ImageMode) -> None:
+        self.mode = mode
+        self.calls.append(("mode", mode))
+
+    def get_global_mode(self) -> ImageMode:
+        return self.mode
+
+    def set_background_color(self, color: Color) -> None:
+        self.background = color
+        self.calls.append(("background", color))
+
+    def get_background_color(self) -> Color:
+        return self.background
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeScheduler:
+    """Collects scheduled callbacks until the test runs them."""
+
+    def __init__(self) -> None:
+        self.scheduled: list[tuple[float, Callable[[], None]]] = []
+
+    def __call__(self, delay: float, callback: Callable[[], None]) -> None:
+        self.scheduled.append((delay, callback))
+
+    def run_all(self) -> None:
+        scheduled, self.scheduled = self.scheduled, []
+        for _, callback in scheduled:
+            callback()
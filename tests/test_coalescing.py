@@ -0,0 +1,167 @@
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from fakes import (
+    FakeClock,
+    FakeDesktopManager,
+    FakeMonitorDescription,
+    FakeScheduler,
+)
+from wallpaper_py.coalescing import CoalescingDesktopManager, Scheduler
+from wallpaper_py.desktop_protocol import ImageMode, MonitorDescription, Rectangle
+
+MONITOR_A = FakeMonitorDescription(Rectangle(0, 0, 1920, 1080))
+MONITOR_B = FakeMonitorDescription(Rectangle(1920, 0, 3840, 1080))
+
+
+@pytest.fixture(name="clock")
+def clock_fixture() -> FakeClock:
+    return FakeClock()
+
+
+def make_manager(
+    clock: FakeClock, per_monitor: bool = False, scheduler: Optional[Scheduler] = None
+) -> tuple[CoalescingDesktopManager, FakeDesktopManager]:
+    backend = FakeDesktopManager(per_monitor=per_monitor)
+    manager = CoalescingDesktopManager(backend, 0.2, clock, scheduler)
+    return manager, backend
+
+
+def test_last_update_per_monitor_wins(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    for index in range(5):
+        manager.set_wallpaper(MONITOR_A, Path(f"a{index}"))
+        manager.set_wallpaper(MONITOR_B, Path(f"b{index}"))
+    manager.flush()
+
+    assert backend.calls == [
+        ("wallpaper", MONITOR_A, Path("a4"), None),
+        ("wallpaper", MONITOR_B, Path("b4"), None),
+    ]
+
+
+def test_global_mode_between_wallpapers_keeps_its_order(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock, per_monitor=True)
+    manager.set_wallpaper(MONITOR_A, Path("1"), mode=ImageMode.FIT)
+    manager.set_global_mode(ImageMode.FILL)
+    manager.set_wallpaper(MONITOR_A, Path("2"))
+    manager.flush()
+
+    # Applied one by one, the global FILL overrides A's earlier FIT.
+    assert backend.calls == [
+        ("mode", ImageMode.FILL),
+        ("wallpaper", MONITOR_A, Path("2"), None),
+    ]
+
+
+def test_per_monitor_mode_is_kept_without_global_change(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock, per_monitor=True)
+    manager.set_wallpaper(MONITOR_A, Path("1"), mode=ImageMode.FIT)
+    manager.set_wallpaper(MONITOR_A, Path("2"))
+    manager.flush()
+
+    assert backend.calls == [("wallpaper", MONITOR_A, Path("2"), ImageMode.FIT)]
+
+
+def test_stats_count_updates_consistently(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    manager.set_wallpaper(MONITOR_A, Path("1"), mode=ImageMode.FIT)
+    manager.set_wallpaper(MONITOR_A, Path("2"), mode=ImageMode.STRETCH)
+    manager.set_global_mode(ImageMode.FILL)
+    manager.flush()
+
+    stats = manager.stats
+    assert stats.calls == 3
+    # Each wallpaper call with a global mode is a wallpaper and a mode update.
+    assert stats.received == 5
+    assert stats.dropped == 3  # wallpaper 1, FIT and STRETCH
+    assert stats.applied == len(backend.calls) == 2
+    assert stats.received == stats.applied + stats.dropped
+
+
+def test_poll_applies_only_after_window(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    manager.set_wallpaper(MONITOR_A, Path("1"))
+
+    clock.advance(0.1)
+    assert not manager.poll()
+    assert not backend.calls
+    assert manager.pending_count() == 1
+
+    clock.advance(0.1)
+    assert manager.poll()
+    assert backend.calls == [("wallpaper", MONITOR_A, Path("1"), None)]
+    assert not manager.poll()
+
+
+def test_scheduler_flushes_at_end_of_window(clock: FakeClock) -> None:
+    scheduler = FakeScheduler()
+    manager, backend = make_manager(clock, scheduler=scheduler)
+    manager.set_wallpaper(MONITOR_A, Path("1"))
+    manager.set_wallpaper(MONITOR_A, Path("2"))
+
+    assert [delay for delay, _ in scheduler.scheduled] == [0.2]
+    clock.advance(0.2)
+    scheduler.run_all()
+
+    assert backend.calls == [("wallpaper", MONITOR_A, Path("2"), None)]
+    assert not scheduler.scheduled
+
+
+def test_early_timer_is_rescheduled(clock: FakeClock) -> None:
+    scheduler = FakeScheduler()
+    manager, backend = make_manager(clock, scheduler=scheduler)
+    manager.set_wallpaper(MONITOR_A, Path("1"))
+
+    clock.advance(0.15)
+    scheduler.run_all()
+
+    assert not backend.calls
+    assert [delay for delay, _ in scheduler.scheduled] == [pytest.approx(0.05)]
+    clock.advance(0.05)
+    scheduler.run_all()
+    assert backend.calls == [("wallpaper", MONITOR_A, Path("1"), None)]
+
+
+def test_concurrent_callers_lose_no_updates(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    monitors = [
+        FakeMonitorDescription(Rectangle(x, 0, x + 10, 10)) for x in range(0, 80, 10)
+    ]
+
+    def scrub(monitor: MonitorDescription) -> None:
+        for index in range(200):
+            manager.set_wallpaper(monitor, Path(str(index)))
+
+    threads = [threading.Thread(target=scrub, args=(m,)) for m in monitors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.flush()
+
+    last = [("wallpaper", monitor, Path("199"), None) for monitor in monitors]
+    assert len(backend.calls) == len(last)
+    assert all(call in last for call in backend.calls)
+    assert manager.stats.received == manager.stats.applied + manager.stats.dropped
+
+
+def test_context_manager_flushes_on_exit(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    with manager:
+        manager.set_global_mode(ImageMode.FIT)
+        assert not backend.calls
+    assert backend.calls == [("mode", ImageMode.FIT)]
+
+
+def test_background_colour_is_coalesced(clock: FakeClock) -> None:
+    manager, backend = make_manager(clock)
+    manager.set_background_color((1, 2, 3))
+    manager.set_background_color((0, 0, 0))
+
+    assert manager.get_background_color() == (0, 0, 0)
+    manager.flush()
+    assert backend.calls == [("background", (0, 0, 0))]
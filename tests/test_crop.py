@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from wallpaper_py import crop
+from wallpaper_py.crop import CENTER_FOCUS, CropStrategy, find_focus, get_focus
+
+SMART_STRATEGIES = [CropStrategy.ENTROPY, CropStrategy.EDGES]
+
+
+def detail_on_right() -> Image.Image:
+    """A dark 512x256 proxy with a noisy band on its right quarter."""
+    img = Image.new("L", (512, 256), 0)
+    img.paste(Image.effect_noise((128, 256), 80).convert("L"), (384, 0))
+    return crop.make_proxy(img)
+
+
+class CountingProxyLoader:
+    def __init__(self) -> None:
+        self.calls: list[Path] = []
+
+    def __call__(self, source_path: Path) -> Image.Image:
+        self.calls.append(source_path)
+        return crop.make_proxy(Image.new("L", (40, 20)))
+
+
+@pytest.fixture(name="proxy_loads")
+def proxy_loads_fixture(monkeypatch: pytest.MonkeyPatch) -> CountingProxyLoader:
+    loads = CountingProxyLoader()
+    monkeypatch.setattr(crop, "load_proxy", loads)
+    return loads
+
+
+@pytest.mark.parametrize("strategy", SMART_STRATEGIES)
+def test_focus_moves_toward_detail(strategy: CropStrategy) -> None:
+    proxy = detail_on_right()
+
+    horizontal = find_focus(proxy, 1.0, strategy)
+    vertical = find_focus(proxy.transpose(Image.Transpose.ROTATE_90), 1.0, strategy)
+
+    assert horizontal[0] > 0.7 and horizontal[1] == 0.5
+    assert vertical[0] == 0.5 and vertical[1] < 0.3  # the band is now on top
+
+
+@pytest.mark.parametrize("strategy", SMART_STRATEGIES)
+def test_uniform_image_keeps_centre(strategy: CropStrategy) -> None:
+    proxy = crop.make_proxy(Image.new("RGB", (512, 256), (90, 120, 150)))
+
+    assert find_focus(proxy, 1.0, strategy) == CENTER_FOCUS
+
+
+def test_focus_is_cached_per_aspect_ratio(
+    tmp_path: Path, proxy_loads: CountingProxyLoader
+) -> None:
+    source = tmp_path / "source.png"
+    source.touch()
+
+    first = get_focus(source, (1920, 1080), CropStrategy.EDGES)
+    second = get_focus(source, (1280, 720), CropStrategy.EDGES)
+
+    assert first == second
+    assert proxy_loads.calls == [source]
+
+
+def test_focus_cache_evicts_least_recently_used(
+    tmp_path: Path, proxy_loads: CountingProxyLoader, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(crop, "FOCUS_CACHE_SIZE", 2)
+    first, second, third = (tmp_path / f"{index}.png" for index in range(3))
+    for path in (first, second, third):
+        path.touch()
+
+    for path in (first, second, first, third, first, second):
+        get_focus(path, (16, 9), CropStrategy.ENTROPY)
+
+    assert proxy_loads.calls == [first, second, third, second]
@@ -0,0 +1,247 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, cast
+
+import pytest
+from PIL import ExifTags, Image
+
+from wallpaper_py import crop, image
+from wallpaper_py.crop import CropStrategy
+from wallpaper_py.desktop_protocol import ImageMode
+from wallpaper_py.probe import InvalidImageError, probe_image
+
+
+@pytest.fixture(name="destination", autouse=True)
+def destination_fixture(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    output = tmp_path / "processed"
+    output.mkdir()
+    monkeypatch.setattr(image, "DESTINATION", output)
+    image.PROCESSING_STATS.reset()
+    return output
+
+
+def save_rotated_jpeg(path: Path) -> None:
+    """Save a 40x20 image stored sideways, with EXIF asking for a 90° turn."""
+    img = Image.new("RGB", (40, 20), (0, 0, 255))
+    img.paste((255, 0, 0), (0, 0, 20, 20))  # red on the left when stored
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6  # display rotated 90° clockwise
+    img.save(path, exif=exif, quality=95)
+
+
+def test_exif_orientation_is_applied(tmp_path: Path) -> None:
+    source = tmp_path / "rotated.jpg"
+    save_rotated_jpeg(source)
+
+    output = image.process_image(source, 20, 40, ImageMode.FILL)
+
+    with Image.open(output) as result:
+        assert result.size == (20, 40)
+        assert ExifTags.Base.Orientation not in result.getexif()
+        red, _, blue = result.convert("RGB").getpixel((10, 5))  # type: ignore[misc]
+        assert red > 200 and blue < 50  # stored left half is now on top
+    assert image.PROCESSING_STATS.rendered == 1
+
+
+def test_matching_source_is_passed_through(tmp_path: Path) -> None:
+    source = tmp_path / "exact.png"
+    Image.new("RGB", (32, 24)).save(source)
+
+    output = image.process_image(source, 32, 24, ImageMode.FIT)
+
+    assert output == source
+    assert image.PROCESSING_STATS.passthrough == 1
+    assert image.PROCESSING_STATS.rendered == 0
+
+
+@pytest.mark.parametrize(
+    "passthrough", [image.Passthrough.LINK, image.Passthrough.COPY]
+)
+def test_passthrough_places_source_in_destination(
+    tmp_path: Path, destination: Path, passthrough: image.Passthrough
+) -> None:
+    source = tmp_path / "exact.jpg"
+    Image.new("RGB", (32, 24)).save(source)
+
+    output = image.process_image(
+        source, 32, 24, ImageMode.FILL, image.ProcessOptions(passthrough=passthrough)
+    )
+
+    assert output.parent == destination
+    assert output.read_bytes() == source.read_bytes()
+    assert image.PROCESSING_STATS.passthrough == 1
+
+
+def test_reencoded_source_counts_as_rendered(tmp_path: Path) -> None:
+    source = tmp_path / "exact.tiff"
+    Image.new("RGB", (80, 60)).save(source)
+
+    output = image.process_image(source, 80, 60, ImageMode.FILL)
+
+    assert output.suffix == ".png"
+    assert image.PROCESSING_STATS.passthrough == 0
+    assert image.PROCESSING_STATS.rendered == 1
+
+
+def make_pattern(mode: str) -> Image.Image:
+    """A 600x300 image in the given mode with detail on the right side."""
+    img = Image.new("L", (600, 300), 0)
+    img.paste(Image.effect_noise((150, 300), 80).convert("L"), (450, 0))
+    return img.convert(mode)
+
+
+@pytest.mark.parametrize("mode", ["RGB", "P", "1", "I;16"])
+@pytest.mark.parametrize("strategy", [CropStrategy.ENTROPY, CropStrategy.EDGES])
+def test_smart_crop_follows_detail(
+    tmp_path: Path, mode: str, strategy: CropStrategy
+) -> None:
+    source = tmp_path / "source.png"
+    make_pattern(mode).save(source)
+
+    output = image.process_image(
+        source, 300, 300, ImageMode.FILL, image.ProcessOptions(crop_strategy=strategy)
+    )
+
+    with Image.open(output) as result:
+        assert result.size == (300, 300)
+        # The window is pushed against the right edge, keeping all the detail.
+        assert result.convert("L").crop((150, 0, 300, 300)).getbbox() is not None
+
+
+def test_repeat_smart_crop_reuses_focus(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "source.png"
+    make_pattern("RGB").save(source)
+    loads: list[Path] = []
+    load_proxy = crop.load_proxy
+
+    def counting_load_proxy(source_path: Path) -> Image.Image:
+        loads.append(source_path)
+        return load_proxy(source_path)
+
+    monkeypatch.setattr(crop, "load_proxy", counting_load_proxy)
+    options = image.ProcessOptions(crop_strategy=CropStrategy.EDGES)
+
+    first = image.process_image(source, 300, 300, ImageMode.FILL, options)
+    second = image.process_image(source, 300, 300, ImageMode.FILL, options)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert loads == [source]
+
+
+def encode(img: Image.Image, image_format: str = "PNG") -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("mode", ["P", "1", "I;16"])
+def test_in_memory_fill_handles_non_reducible_modes(mode: str) -> None:
+    data = encode(make_pattern(mode))
+
+    for strategy in CropStrategy:
+        options = image.ProcessOptions(crop_strategy=strategy)
+        result = image.render_image(data, 300, 300, ImageMode.FILL, options)
+        assert result.size == (300, 300)
+
+
+@pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+def test_render_accepts_buffers(
+    buffer_type: Callable[[bytes], image.ImageSource],
+) -> None:
+    source = buffer_type(encode(Image.new("RGB", (80, 60))))
+
+    result = image.render_image(source, 40, 30, ImageMode.STRETCH)
+
+    assert result.size == (40, 30)
+
+
+def test_render_accepts_file_objects() -> None:
+    file = BytesIO(encode(Image.new("RGB", (80, 60), (0, 255, 0))))
+    # The header probe must not leave the file positioned after the header.
+    assert probe_image(file).size == (80, 60)
+
+    result = image.render_image(file, 40, 30, ImageMode.FILL)
+
+    assert result.size == (40, 30)
+    assert result.getpixel((20, 15)) == (0, 255, 0)
+
+
+def test_render_accepts_pil_images() -> None:
+    source = Image.new("RGB", (80, 60), (255, 0, 0))
+
+    assert image.render_image(source, 80, 60, ImageMode.FIT) is source
+    result = image.render_image(source, 160, 60, ImageMode.FIT)
+    assert result.size == (160, 60)
+    assert result.getpixel((0, 30)) == image.FIT_BACKGROUND
+    assert result.getpixel((80, 30)) == (255, 0, 0)
+
+
+def test_render_accepts_numpy_arrays() -> None:
+    numpy = pytest.importorskip("numpy")
+    array = numpy.zeros((60, 80, 3), dtype=numpy.uint8)
+    array[:, 40:] = (0, 0, 255)
+
+    options = image.ProcessOptions(crop_strategy=CropStrategy.EDGES)
+    result = image.render_image(array, 30, 60, ImageMode.FILL, options)
+
+    assert result.size == (30, 60)
+    assert result.mode == "RGB"
+
+
+def test_render_rejects_invalid_sources() -> None:
+    with pytest.raises(InvalidImageError):
+        image.render_image(b"not an image", 40, 30, ImageMode.FIT)
+    with pytest.raises(InvalidImageError):
+        truncated = encode(Image.effect_noise((80, 60), 50), "JPEG")[:200]
+        image.render_image(truncated, 40, 30, ImageMode.FIT)
+    with pytest.raises(TypeError):
+        image.render_image(cast(image.ImageSource, 42), 40, 30, ImageMode.FIT)
+
+
+def test_buffer_passthrough_returns_input_unchanged() -> None:
+    data = encode(Image.new("RGB", (80, 60)))
+
+    assert image.process_buffer(data, 80, 60, ImageMode.FIT) is data
+    assert image.PROCESSING_STATS.passthrough == 1
+
+
+def test_buffer_is_reencoded_in_requested_format() -> None:
+    data = encode(Image.new("RGB", (80, 60)))
+    options = image.ProcessOptions(image_format="JPEG")
+
+    result = image.process_buffer(data, 80, 60, ImageMode.FIT, options)
+
+    with Image.open(BytesIO(result)) as decoded:
+        assert (decoded.format, decoded.size) == ("JPEG", (80, 60))
+    assert image.PROCESSING_STATS.rendered == 1
+
+
+def test_batch_uses_loaded_content(tmp_path: Path) -> None:
+    sources = [tmp_path / f"source_{index}.png" for index in range(3)]
+    for index, path in enumerate(sources):
+        make_pattern("RGB").crop((0, 0, 100 + index, 50)).save(path)
+    loaded = [(path, path.read_bytes()) for path in sources]
+    for path in sources:
+        path.write_bytes(b"")  # decoding the file from disk would now fail
+    options = image.ProcessOptions(crop_strategy=CropStrategy.ENTROPY)
+
+    outputs = list(image.process_batch(loaded, 50, 50, ImageMode.FILL, options))
+
+    assert [output.name for output in outputs] == [
+        f"FILL entropy 50x50 source_{index}.png" for index in range(3)
+    ]
+    assert image.PROCESSING_STATS.rendered == 3
+
+
+def test_batch_passthrough_copies_loaded_content(tmp_path: Path) -> None:
+    source = tmp_path / "exact.png"
+    data = encode(Image.new("RGB", (50, 50)))
+    source.write_bytes(b"")
+    options = image.ProcessOptions(passthrough=image.Passthrough.COPY)
+
+    (output,) = image.process_batch([(source, data)], 50, 50, ImageMode.FIT, options)
+
+    assert output.read_bytes() == data
+    assert image.PROCESSING_STATS.passthrough == 1
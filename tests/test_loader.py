@@ -0,0 +1,106 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from wallpaper_py import loader
+from wallpaper_py.loader import PrefetchOptions, prefetch
+
+PATHS = [Path(f"source_{index}.png") for index in range(8)]
+
+
+class RecordingLoader:
+    """Fake loader recording which paths were requested, in any thread."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.started: list[int] = []
+        self.loaded = {index: threading.Event() for index in range(len(PATHS))}
+
+    def __call__(self, path: Path) -> bytes:
+        index = PATHS.index(path)
+        with self.lock:
+            self.started.append(index)
+        self.loaded[index].set()
+        return path.name.encode()
+
+
+class RecordingAdvice:
+    """Fake read-ahead hint recording the path and the calling thread."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: list[tuple[Path, threading.Thread]] = []
+
+    def __call__(self, path: Path) -> None:
+        with self.lock:
+            self.calls.append((path, threading.current_thread()))
+
+    def wait_for(self, count: int) -> list[tuple[Path, threading.Thread]]:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.calls) >= count:
+                    return list(self.calls)
+            time.sleep(0.01)
+        raise AssertionError(f"only {len(self.calls)} of {count} hints issued")
+
+
+@pytest.fixture(name="advice", autouse=True)
+def advice_fixture(monkeypatch: pytest.MonkeyPatch) -> RecordingAdvice:
+    advice = RecordingAdvice()
+    monkeypatch.setattr(loader, "advise_willneed", advice)
+    return advice
+
+
+@pytest.mark.parametrize("depth", [0, 1, 3])
+def test_prefetch_yields_in_order_and_stays_bounded(depth: int) -> None:
+    fake = RecordingLoader()
+    results = []
+    for index, (path, content) in enumerate(
+        prefetch(PATHS, PrefetchOptions(depth, loader=fake))
+    ):
+        with fake.lock:
+            # Never more than `depth` files ahead of the one being consumed.
+            assert max(fake.started) <= index + depth
+        results.append((path, content))
+
+    assert results == [(path, path.name.encode()) for path in PATHS]
+    assert sorted(fake.started) == list(range(len(PATHS)))
+
+
+def test_prefetch_loads_ahead_while_consumer_works() -> None:
+    fake = RecordingLoader()
+    batch = prefetch(PATHS, PrefetchOptions(depth=2, loader=fake))
+
+    next(batch)
+
+    # Both following files are loaded without being requested by the consumer.
+    assert fake.loaded[1].wait(timeout=5)
+    assert fake.loaded[2].wait(timeout=5)
+    assert not fake.loaded[3].is_set()
+    batch.close()
+
+
+def test_prefetch_advises_readahead_window_from_workers(
+    advice: RecordingAdvice,
+) -> None:
+    options = PrefetchOptions(depth=2, readahead=3, loader=RecordingLoader())
+    batch = prefetch(PATHS, options)
+
+    next(batch)
+
+    # File 2 was queued when file 0 was handed out, hints reach three past it.
+    calls = advice.wait_for(5)
+    assert sorted(path for path, _ in calls) == PATHS[1:6]
+    assert threading.main_thread() not in {thread for _, thread in calls}
+    batch.close()
+
+
+def test_read_strategies_return_file_content(tmp_path: Path) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 64)
+
+    for read in loader.LOADERS.values():
+        assert read(path) == path.read_bytes()
@@ -0,0 +1,183 @@
+from pathlib import Path
+
+import pytest
+from PIL import ExifTags, Image
+
+from fakes import FakeDesktopManager, make_monitor
+from wallpaper_py import image
+from wallpaper_py.desktop_protocol import ImageMode
+from wallpaper_py.planner import (
+    PLANNER_STATS,
+    Renderer,
+    apply_plan,
+    plan_render,
+    render_wallpaper,
+)
+from wallpaper_py.probe import probe_image
+
+TARGET = (160, 120)
+
+
+@pytest.fixture(autouse=True)
+def destination(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    output = tmp_path / "processed"
+    output.mkdir()
+    monkeypatch.setattr(image, "DESTINATION", output)
+    PLANNER_STATS.reset()
+
+
+def save_source(path: Path, size: tuple[int, int], orientation: int = 1) -> Path:
+    """Save an RGB image with distinct content along both axes."""
+    red = Image.linear_gradient("L").resize(size)
+    green = red.transpose(Image.Transpose.ROTATE_90).resize(size)
+    blue = Image.radial_gradient("L").resize(size)
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    Image.merge("RGB", (red, green, blue)).save(path, exif=exif)
+    return path
+
+
+def reference_fit(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
+    """FIT as originally implemented: scale by the smaller ratio, centre on black."""
+    target_width, target_height = target_size
+    ratio = min(target_width / img.width, target_height / img.height)
+    new_width, new_height = int(img.width * ratio), int(img.height * ratio)
+    canvas = Image.new("RGB", target_size, (0, 0, 0))
+    canvas.paste(
+        img.resize((new_width, new_height), Image.Resampling.LANCZOS),
+        ((target_width - new_width) // 2, (target_height - new_height) // 2),
+    )
+    return canvas
+
+
+def letterbox(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
+    """What the backend shows for an image in FIT position on black."""
+    canvas = Image.new("RGB", target_size, (0, 0, 0))
+    x = (target_size[0] - img.width) // 2
+    y = (target_size[1] - img.height) // 2
+    canvas.paste(img, (x, y))
+    return canvas
+
+
+@pytest.mark.parametrize(
+    "size, scaled_size",
+    [((400, 100), (160, 40)), ((100, 400), (30, 120)), ((200, 100), (160, 80))],
+    ids=["landscape", "portrait", "wide"],
+)
+def test_os_scaling_matches_full_render(
+    tmp_path: Path, size: tuple[int, int], scaled_size: tuple[int, int]
+) -> None:
+    source = save_source(tmp_path / "source.png", size)
+    options = image.ProcessOptions(os_scaling=True)
+
+    scaled = image.process_image(source, *TARGET, ImageMode.FIT, options)
+    full = image.process_image(source, *TARGET, ImageMode.FIT)
+
+    with Image.open(scaled) as delegated, Image.open(full) as rendered:
+        assert delegated.size == scaled_size
+        with Image.open(source) as original:
+            expected = reference_fit(original, TARGET)
+        assert letterbox(delegated, TARGET).tobytes() == expected.tobytes()
+        assert rendered.tobytes() == expected.tobytes()
+        assert rendered.getpixel((0, 0)) == (0, 0, 0)
+
+
+def test_plan_uses_os_when_global_state_matches(tmp_path: Path) -> None:
+    monitors = [
+        make_monitor(0, *TARGET, tmp_path / "missing.png"),
+        make_monitor(160, 80, 60, tmp_path / "missing.png"),
+    ]
+    manager = FakeDesktopManager(monitors, mode=ImageMode.FIT)
+    info = probe_image(save_source(tmp_path / "source.png", (400, 100)))
+
+    plan = plan_render(manager, monitors[0].monitor_description, info, ImageMode.FIT)
+
+    assert plan.renderer == Renderer.OS
+    assert plan.output_size == (160, 40)
+    assert plan.pixels_saved() == 160 * 120 - 160 * 40
+
+
+def test_plan_uses_upright_size(tmp_path: Path) -> None:
+    monitor = make_monitor(0, *TARGET, tmp_path / "missing.png")
+    manager = FakeDesktopManager([monitor], mode=ImageMode.FIT)
+    # Stored 100x400, displayed 400x100 after a 90° turn.
+    info = probe_image(save_source(tmp_path / "source.jpg", (100, 400), 6))
+
+    plan = plan_render(manager, monitor.monitor_description, info, ImageMode.FIT)
+
+    assert plan.output_size == (160, 40)
+
+
+def test_plan_uses_os_when_other_monitors_are_unaffected(tmp_path: Path) -> None:
+    exact = save_source(tmp_path / "exact.png", (80, 60))
+    monitors = [
+        make_monitor(0, *TARGET, tmp_path / "missing.png"),
+        make_monitor(160, 80, 60, exact),
+    ]
+    manager = FakeDesktopManager(monitors, mode=ImageMode.FILL, background=(9, 9, 9))
+    info = probe_image(save_source(tmp_path / "source.png", (400, 100)))
+
+    plan = plan_render(manager, monitors[0].monitor_description, info, ImageMode.FIT)
+
+    assert plan.renderer == Renderer.OS
+
+
+@pytest.mark.parametrize(
+    "per_monitor, background, renderer",
+    [
+        (False, (0, 0, 0), Renderer.PYTHON),  # global FILL position would change
+        (True, (0, 0, 0), Renderer.OS),  # only the background is global
+        (True, (9, 9, 9), Renderer.PYTHON),  # other monitor shows the background
+    ],
+)
+def test_plan_falls_back_when_other_monitor_would_change(
+    tmp_path: Path,
+    per_monitor: bool,
+    background: tuple[int, int, int],
+    renderer: Renderer,
+) -> None:
+    smaller = save_source(tmp_path / "smaller.png", (40, 30))
+    monitors = [
+        make_monitor(0, *TARGET, tmp_path / "missing.png"),
+        make_monitor(160, 80, 60, smaller),
+    ]
+    manager = FakeDesktopManager(
+        monitors, per_monitor, mode=ImageMode.FILL, background=background
+    )
+    info = probe_image(save_source(tmp_path / "source.png", (400, 100)))
+
+    plan = plan_render(manager, monitors[0].monitor_description, info, ImageMode.FIT)
+
+    assert plan.renderer == renderer
+
+
+def test_render_wallpaper_sets_plan_state(tmp_path: Path) -> None:
+    monitor = make_monitor(0, *TARGET, tmp_path / "missing.png")
+    manager = FakeDesktopManager([monitor], mode=ImageMode.FIT)
+    source = save_source(tmp_path / "source.png", (400, 100))
+
+    output = render_wallpaper(
+        manager, monitor.monitor_description, source, ImageMode.FIT
+    )
+
+    assert manager.calls == [
+        ("background", (0, 0, 0)),
+        ("wallpaper", monitor.monitor_description, output, ImageMode.FIT),
+    ]
+    assert PLANNER_STATS.os_rendered == 1
+    assert PLANNER_STATS.pixels_written == 160 * 40
+
+
+def test_passed_through_source_writes_no_pixels(tmp_path: Path) -> None:
+    monitor = make_monitor(0, *TARGET, tmp_path / "missing.png")
+    manager = FakeDesktopManager([monitor], mode=ImageMode.FIT)
+    source = save_source(tmp_path / "scaled.png", (160, 40))
+    plan = plan_render(
+        manager, monitor.monitor_description, probe_image(source), ImageMode.FIT
+    )
+
+    output = apply_plan(manager, monitor.monitor_description, source, plan)
+
+    assert output == source
+    assert PLANNER_STATS.pixels_written == 0
+    assert PLANNER_STATS.pixels_saved == 160 * 120 - 160 * 40
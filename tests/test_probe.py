@@ -0,0 +1,71 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from PIL import ExifTags, Image, ImageFile
+
+from wallpaper_py.probe import EncodedSource, InvalidImageError, probe_image
+
+
+def test_probe_reads_header(tmp_path: Path) -> None:
+    source = tmp_path / "source.jpg"
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    Image.new("L", (40, 20)).save(source, exif=exif)
+
+    info = probe_image(source)
+
+    assert (info.format, info.size, info.mode) == ("JPEG", (40, 20), "L")
+    assert info.orientation == 6
+    assert not info.is_upright()
+
+
+def test_probe_does_not_decode_png(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "source.png"
+    Image.new("RGB", (40, 20)).save(source)
+
+    def fail_load(_: ImageFile.ImageFile) -> None:
+        raise AssertionError("pixel data was decoded")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", fail_load)
+
+    info = probe_image(source)
+
+    assert info.size == (40, 20)
+    assert info.is_upright()
+
+
+def test_probe_rejects_non_images(tmp_path: Path) -> None:
+    source = tmp_path / "notes.txt"
+    source.write_text("not an image")
+
+    with pytest.raises(InvalidImageError):
+        probe_image(source)
+
+
+def encode(img: Image.Image, image_format: str = "PNG") -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+def test_probe_reads_buffers(buffer_type: Callable[[bytes], EncodedSource]) -> None:
+    info = probe_image(buffer_type(encode(Image.new("RGB", (40, 20)))))
+
+    assert (info.format, info.size) == ("PNG", (40, 20))
+
+
+def test_probe_rewinds_file_objects() -> None:
+    file = BytesIO(encode(Image.new("RGB", (40, 20))))
+
+    assert probe_image(file).size == (40, 20)
+    assert file.tell() == 0
+
+
+def test_probe_rejects_invalid_buffers() -> None:
+    with pytest.raises(InvalidImageError):
+        probe_image(b"not an image")
@@ -1,9 +1,12 @@
 import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-from wallpaper_py.cli_parsers import existing_file_type
-from wallpaper_py.image import image_mode_parse, process_image
+from wallpaper_py.cli_parsers import probed_image_type
+from wallpaper_py.crop import CropStrategy
+from wallpaper_py.image import ProcessOptions, image_mode_parse
+from wallpaper_py.planner import PLANNER_STATS, render_wallpaper
+from wallpaper_py.probe import SourceFile
 from .desktop_manager import DesktopManager
 from .desktop_protocol import ImageMode
 
@@ -27,7 +30,10 @@ def list_monitors() -> None:
 
 
 def set_wallpaper(
-    image_path: Path, monitor_ix: int, mode: Optional[ImageMode] = None
+    image: Union[Path, SourceFile],
+    monitor_ix: int,
+    mode: Optional[ImageMode] = None,
+    crop_strategy: CropStrategy = CropStrategy.CENTER,
 ) -> None:
     manager = DesktopManager()
     monitors = manager.get_monitors()
@@ -37,11 +43,17 @@ def set_wallpaper(
         raise RuntimeError(
             f"Invalid monitor index: {monitor_ix}! Found monitors: {monitors}"
         ) from err
-    image = image_path
-    if mode is not None:
-        rect = monitor.monitor_description.rect
-        image = process_image(image_path, rect.get_width(), rect.get_height(), mode)
-    manager.set_wallpaper(monitor.monitor_description, image)
+    if mode is None:
+        image_path = image if isinstance(image, Path) else image.path
+        manager.set_wallpaper(monitor.monitor_description, image_path)
+        return
+    render_wallpaper(
+        manager,
+        monitor.monitor_description,
+        image,
+        mode,
+        ProcessOptions(crop_strategy=crop_strategy),
+    )
 
 
 def main() -> None:
@@ -49,10 +61,14 @@ def main() -> None:
     if args.command == "list":
         list_monitors()
     elif args.command == "set":
-        set_wallpaper(args.image_path, args.monitor, args.mode)
+        set_wallpaper(args.image_path, args.monitor, args.mode, args.crop)
         print(
             f"Wallpaper set successfully on monitor {args.monitor} with {args.mode} mode"
         )
+        if PLANNER_STATS.os_rendered:
+            print(
+                f"Scaling delegated to the OS, {PLANNER_STATS.pixels_saved} pixels saved"
+            )
 
 
 def get_args() -> argparse.Namespace:
@@ -65,7 +81,7 @@ def get_args() -> argparse.Namespace:
     # Set command
     set_parser = subparsers.add_parser("set", help="Set wallpaper for a monitor")
     set_parser.add_argument(
-        "image_path", type=existing_file_type, help="Path to the image file"
+        "image_path", type=probed_image_type, help="Path to the image file"
     )
     set_parser.add_argument(
         "-m", "--monitor", type=int, default=0, help="Monitor index (default: 0)"
@@ -76,6 +92,13 @@ def get_args() -> argparse.Namespace:
         choices=list(ImageMode),
         help="Wallpaper position mode (default: None)",
     )
+    set_parser.add_argument(
+        "--crop",
+        type=CropStrategy,
+        choices=list(CropStrategy),
+        default=CropStrategy.CENTER,
+        help="Crop window placement for fill mode (default: center)",
+    )
     return parser.parse_args()
 
 
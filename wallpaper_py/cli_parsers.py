@@ -1,9 +1,23 @@
 from pathlib import Path
 import argparse
 
+from .probe import InvalidImageError, SourceFile, probe_source
+
 
 def existing_file_type(arg: str) -> Path:
     path = Path(arg)
     if not path.exists():
         raise argparse.ArgumentTypeError(f"{path} is not an existing file!")
     return path
+
+
+def probed_image_type(arg: str) -> SourceFile:
+    path = existing_file_type(arg)
+    try:
+        return probe_source(path)
+    except InvalidImageError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+
+
+def existing_image_type(arg: str) -> Path:
+    return probed_image_type(arg).path
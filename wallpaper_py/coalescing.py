@@ -0,0 +1,262 @@
+"""
+Coalescing wrapper around a DesktopManager.
+
+Bursts of wallpaper and mode changes (e.g. a user scrubbing through a picker)
+would otherwise each reach the backend and trigger a desktop repaint. The
+CoalescingDesktopManager collects updates within a time window and applies
+only the last update per monitor, plus the last global mode and background
+colour.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Union, cast
+
+from .desktop_protocol import (
+    Color,
+    DesktopManager,
+    ImageMode,
+    Monitor,
+    MonitorDescription,
+    UnsupportedModeError,
+)
+
+# Calls the callback once, `delay` seconds from now, on some other thread.
+Scheduler = Callable[[float, Callable[[], None]], None]
+
+
+def timer_scheduler(delay: float, callback: Callable[[], None]) -> None:
+    """Scheduler running the callback on a daemon threading.Timer."""
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+
+@dataclass
+class _WallpaperUpdate:
+    monitor_description: MonitorDescription
+    wallpaper: Path
+    mode: Optional[ImageMode] = None
+
+
+@dataclass
+class _ModeUpdate:
+    mode: ImageMode
+
+
+@dataclass
+class _BackgroundUpdate:
+    color: Color
+
+
+_Update = Union[_WallpaperUpdate, _ModeUpdate, _BackgroundUpdate]
+
+
+@dataclass
+class _Batch:
+    start: float
+    updates: list[_Update] = field(default_factory=list)
+
+
+@dataclass
+class CoalescingStats:
+    """
+    `calls` counts setter calls. The other counters count updates, the unit
+    batches are coalesced in: every call is one update, except set_wallpaper
+    with a mode on a backend with a global mode, which is a wallpaper and a
+    separate mode update. Each received update is eventually either applied
+    or dropped because a newer one replaced it.
+    """
+
+    calls: int = 0
+    received: int = 0
+    applied: int = 0
+    dropped: int = 0
+
+
+class CoalescingDesktopManager(DesktopManager):
+    """
+    DesktopManager that batches updates before forwarding them to `backend`.
+
+    A batch opens with the first update after a flush and is applied once
+    `window` seconds have passed on `clock`. Without a `scheduler` there is no
+    background timer: pending updates are applied only when a new update
+    arrives after the window, on poll() or on flush(). Callers must then call
+    poll() periodically (e.g. from their event loop), or use the manager as a
+    context manager, which flushes on exit, so the last update of a burst is
+    not left pending. With a `scheduler` (e.g. timer_scheduler) each batch
+    also schedules a poll() for the end of its window; backend errors raised
+    from that poll are not seen by the caller.
+
+    Within a batch, a newer wallpaper for the same monitor, a newer global
+    mode or a newer background colour replaces the pending one and moves to
+    the end of the batch, so the surviving updates are applied in the order
+    they were last requested. Reads are forwarded to the backend, except
+    get_global_mode() and get_background_color() which report pending values.
+    The manager may be used from several threads.
+    """
+
+    def __init__(
+        self,
+        backend: DesktopManager,
+        window: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+        scheduler: Optional[Scheduler] = None,
+    ) -> None:
+        self.backend = backend
+        self.window = window
+        self.stats = CoalescingStats()
+        self.__clock = clock
+        self.__scheduler = scheduler
+        # Reentrant: setters poll, and flushes run under the lock so that
+        # concurrent batches reach the backend in order.
+        self.__lock = threading.RLock()
+        self.__batch: Optional[_Batch] = None
+
+    def __enter__(self) -> "CoalescingDesktopManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+    def get_monitors(self) -> Sequence[Monitor]:
+        return self.backend.get_monitors()
+
+    def set_wallpaper(
+        self,
+        monitor_description: MonitorDescription,
+        wallpaper: Path,
+        *,
+        mode: Optional[ImageMode] = None,
+    ) -> None:
+        if mode is not None:
+            self.__check_mode(mode)
+        if mode is None or self.backend.is_mode_per_monitor_supported():
+            self.__push(_WallpaperUpdate(monitor_description, wallpaper, mode))
+            return
+        # A global mode change is coalesced independently of the wallpaper.
+        self.__push(_WallpaperUpdate(monitor_description, wallpaper), _ModeUpdate(mode))
+
+    def get_supported_modes(self) -> Iterable[ImageMode]:
+        return self.backend.get_supported_modes()
+
+    def is_mode_per_monitor_supported(self) -> bool:
+        return self.backend.is_mode_per_monitor_supported()
+
+    def set_global_mode(self, mode: ImageMode) -> None:
+        self.__check_mode(mode)
+        self.__push(_ModeUpdate(mode))
+
+    def get_global_mode(self) -> ImageMode:
+        with self.__lock:
+            for update in reversed(self.__pending()):
+                if isinstance(update, _ModeUpdate):
+                    return update.mode
+        return self.backend.get_global_mode()
+
+    def set_background_color(self, color: Color) -> None:
+        self.__push(_BackgroundUpdate(color))
+
+    def get_background_color(self) -> Color:
+        with self.__lock:
+            for update in reversed(self.__pending()):
+                if isinstance(update, _BackgroundUpdate):
+                    return update.color
+        return self.backend.get_background_color()
+
+    def pending_count(self) -> int:
+        with self.__lock:
+            return len(self.__pending())
+
+    def poll(self) -> bool:
+        """
+        Apply the pending batch if its window has elapsed.
+
+        Returns:
+            True if a batch was applied.
+        """
+        with self.__lock:
+            if self.__batch is None:
+                return False
+            if self.__clock() - self.__batch.start < self.window:
+                return False
+            self.flush()
+            return True
+
+    def flush(self) -> None:
+        """Apply all pending updates immediately."""
+        with self.__lock:
+            pending = self.__pending()
+            self.__batch = None
+            for update in pending:
+                if isinstance(update, _ModeUpdate):
+                    self.backend.set_global_mode(update.mode)
+                elif isinstance(update, _BackgroundUpdate):
+                    self.backend.set_background_color(update.color)
+                else:
+                    self.backend.set_wallpaper(
+                        update.monitor_description, update.wallpaper, mode=update.mode
+                    )
+                self.stats.applied += 1
+
+    def __check_mode(self, mode: ImageMode) -> None:
+        # Reject early, a failure at flush time could not reach the caller.
+        if mode not in self.backend.get_supported_modes():
+            raise UnsupportedModeError(f"{mode} not supported")
+
+    def __push(self, *updates: _Update) -> None:
+        """Queue the updates of one setter call."""
+        with self.__lock:
+            self.poll()
+            self.stats.calls += 1
+            if self.__batch is None:
+                self.__batch = _Batch(self.__clock())
+                if self.__scheduler is not None:
+                    self.__scheduler(self.window, self.__on_timer)
+            for update in updates:
+                self.__replace_pending(self.__batch.updates, update)
+
+    def __pending(self) -> list[_Update]:
+        return [] if self.__batch is None else self.__batch.updates
+
+    def __replace_pending(
+        self, pending_updates: list[_Update], update: _Update
+    ) -> None:
+        self.stats.received += 1
+        for index, pending in enumerate(pending_updates):
+            if self.__supersedes(update, pending):
+                if (
+                    isinstance(update, _WallpaperUpdate)
+                    and update.mode is None
+                    and not any(
+                        isinstance(later, _ModeUpdate)
+                        for later in pending_updates[index + 1 :]
+                    )
+                ):
+                    # Keep a per-monitor mode requested earlier in the batch,
+                    # unless a global mode change was requested after it.
+                    update.mode = cast(_WallpaperUpdate, pending).mode
+                del pending_updates[index]
+                self.stats.dropped += 1
+                break
+        pending_updates.append(update)
+
+    def __on_timer(self) -> None:
+        with self.__lock:
+            if self.poll() or self.__batch is None:
+                return
+            # Fired early, e.g. the timer of an earlier, already flushed batch.
+            remaining = self.__batch.start + self.window - self.__clock()
+        if self.__scheduler is not None:
+            self.__scheduler(remaining, self.__on_timer)
+
+    @staticmethod
+    def __supersedes(update: _Update, pending: _Update) -> bool:
+        if isinstance(update, (_ModeUpdate, _BackgroundUpdate)):
+            return type(pending) is type(update)
+        return (
+            isinstance(pending, _WallpaperUpdate)
+            and pending.monitor_description == update.monitor_description
+        )
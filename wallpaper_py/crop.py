@@ -0,0 +1,183 @@
+"""
+Content-aware crop window selection for FILL mode.
+
+The crop window is scored on a small proxy of the source (decoder-downscaled
+where the format supports it) so that the full-resolution image is never
+analysed. The result is a focus point in relative coordinates, which
+process_fill centres its crop window on.
+"""
+
+from collections import OrderedDict
+from enum import Enum
+from itertools import accumulate
+from math import gcd
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from PIL import Image, ImageFilter, ImageOps
+
+from .probe import EncodedSource, image_info, open_encoded
+
+# Longest edge of the analysis proxy in pixels.
+PROXY_SIZE = 256
+# Number of window positions scored by the entropy strategy.
+ENTROPY_STEPS = 16
+# Number of focus points kept by get_focus.
+FOCUS_CACHE_SIZE = 256
+# Modes Image.reduce() supports that convert cheaply to "L" afterwards.
+REDUCIBLE_MODES = frozenset({"L", "LA", "RGB", "RGBA", "RGBX"})
+
+Focus = tuple[float, float]
+CENTER_FOCUS: Focus = (0.5, 0.5)
+
+
+class CropStrategy(Enum):
+    CENTER = "center"
+    ENTROPY = "entropy"
+    EDGES = "edges"
+
+
+# Least recently used entries first.
+_focus_cache: OrderedDict[
+    tuple[str, int, int, tuple[int, int], CropStrategy], Focus
+] = OrderedDict()
+
+
+def make_proxy(img: Image.Image) -> Image.Image:
+    """Build a grayscale proxy no larger than PROXY_SIZE on its longest edge."""
+    if img.mode not in REDUCIBLE_MODES:
+        # reduce() rejects e.g. palette, bilevel and 16-bit images.
+        img = img.convert("L")
+    factor = max(img.size) // PROXY_SIZE
+    if factor > 1:
+        # Integer box reduction before the colour conversion is much cheaper
+        # than converting the full image.
+        img = img.reduce(factor)
+    proxy = img.convert("L")
+    proxy.thumbnail((PROXY_SIZE, PROXY_SIZE), Image.Resampling.BOX)
+    return proxy
+
+
+def load_proxy(source: EncodedSource) -> Image.Image:
+    """Load a proxy of an encoded image, decoding at reduced scale if possible."""
+    with open_encoded(source) as img:
+        # Lets JPEG decode at 1/2, 1/4 or 1/8 scale instead of full size.
+        img.draft("L", (PROXY_SIZE, PROXY_SIZE))
+        if not image_info(img).is_upright():
+            return make_proxy(ImageOps.exif_transpose(img))
+        return make_proxy(img)
+
+
+def _best_offset(
+    offsets: Sequence[int], center: float, score: Callable[[int], float]
+) -> int:
+    """Return the best scoring offset, preferring the one nearest `center`."""
+    return max(offsets, key=lambda offset: (score(offset), -abs(offset - center)))
+
+
+def _best_window_by_edges(profile: list[int], window: int) -> int:
+    """Return the offset of the window with the largest summed edge energy."""
+    sums = [0, *accumulate(profile)]
+    span = len(profile) - window
+    return _best_offset(
+        range(span + 1), span / 2, lambda offset: sums[offset + window] - sums[offset]
+    )
+
+
+def _best_window_by_entropy(proxy: Image.Image, window: int, horizontal: bool) -> int:
+    """Return the offset of the window with the highest histogram entropy."""
+    span = (proxy.width if horizontal else proxy.height) - window
+    offsets = sorted(
+        {round(span * step / ENTROPY_STEPS) for step in range(ENTROPY_STEPS + 1)}
+    )
+
+    def score(offset: int) -> float:
+        if horizontal:
+            box = (offset, 0, offset + window, proxy.height)
+        else:
+            box = (0, offset, proxy.width, offset + window)
+        return proxy.crop(box).entropy()
+
+    return _best_offset(offsets, span / 2, score)
+
+
+def _edge_profile(proxy: Image.Image, horizontal: bool) -> list[int]:
+    """Edge energy of the proxy summed across the fixed axis."""
+    edges = proxy.filter(ImageFilter.FIND_EDGES)
+    # The filter copies the outermost pixels unchanged, they are not edges.
+    edges = ImageOps.expand(ImageOps.crop(edges, 1), border=1, fill=0)
+    # Collapse the fixed axis with a box filter to get a 1D energy profile.
+    if horizontal:
+        profile = edges.resize((edges.width, 1), Image.Resampling.BOX)
+    else:
+        profile = edges.resize((1, edges.height), Image.Resampling.BOX)
+    return list(profile.tobytes())
+
+
+def find_focus(
+    proxy: Image.Image, target_ratio: float, strategy: CropStrategy
+) -> Focus:
+    """
+    Pick the centre of the most interesting crop window with the target aspect
+    ratio on the proxy image. Ties, e.g. on a uniform image, go to the window
+    nearest the centre.
+    """
+    if strategy == CropStrategy.CENTER:
+        return CENTER_FOCUS
+    horizontal = proxy.width / proxy.height > target_ratio
+    if horizontal:
+        window = max(1, min(proxy.width, round(proxy.height * target_ratio)))
+        length = proxy.width
+    else:
+        window = max(1, min(proxy.height, round(proxy.width / target_ratio)))
+        length = proxy.height
+    if window >= length:
+        return CENTER_FOCUS
+
+    if strategy == CropStrategy.EDGES:
+        offset = _best_window_by_edges(_edge_profile(proxy, horizontal), window)
+    elif strategy == CropStrategy.ENTROPY:
+        offset = _best_window_by_entropy(proxy, window, horizontal)
+    else:
+        raise ValueError(f"Unsupported crop strategy: {strategy}")
+
+    center = (offset + window / 2) / length
+    return (center, 0.5) if horizontal else (0.5, center)
+
+
+def get_focus(
+    source_path: Path,
+    target_size: tuple[int, int],
+    strategy: CropStrategy,
+    data: Optional[bytes] = None,
+) -> Focus:
+    """
+    Return the crop focus for a source file and target size.
+
+    Results are cached per source file (invalidated when it changes) and
+    reduced target aspect ratio, so repeat renders skip the analysis. If the
+    file content was already loaded, pass it as `data` to avoid reading the
+    file again.
+    """
+    if strategy == CropStrategy.CENTER:
+        return CENTER_FOCUS
+    width, height = target_size
+    divisor = gcd(width, height)
+    stat = source_path.stat()
+    key = (
+        str(source_path.resolve()),
+        stat.st_mtime_ns,
+        stat.st_size,
+        (width // divisor, height // divisor),
+        strategy,
+    )
+    focus = _focus_cache.get(key)
+    if focus is not None:
+        _focus_cache.move_to_end(key)
+        return focus
+    proxy = load_proxy(source_path if data is None else data)
+    focus = find_focus(proxy, width / height, strategy)
+    _focus_cache[key] = focus
+    while len(_focus_cache) > FOCUS_CACHE_SIZE:
+        _focus_cache.popitem(last=False)
+    return focus
@@ -32,6 +32,10 @@ class ImageMode(Enum):
     STRETCH = "stretch"
 
 
+# RGB colour with 0-255 channels.
+Color = tuple[int, int, int]
+
+
 class MonitorDescription(Protocol):
     rect: Rectangle
 
@@ -117,3 +121,20 @@ class DesktopManager(Protocol):
         Raises:
             UnsupportedModeError: If the image mode is not set globally.
         """
+
+    def set_background_color(self, color: Color) -> None:
+        """
+        Set the desktop background colour shown around wallpapers that do not
+        cover the whole monitor (e.g. in fit mode).
+
+        Parameters:
+            color: The RGB colour to be applied globally.
+        """
+
+    def get_background_color(self) -> Color:
+        """
+        Get the desktop background colour.
+
+        Returns:
+            The current RGB background colour.
+        """
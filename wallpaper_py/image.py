@@ -1,43 +1,136 @@
 import argparse
+import os
+import shutil
+from dataclasses import dataclass
+from enum import Enum
+from io import BytesIO
 from pathlib import Path
-from PIL import Image
+from typing import Iterable, Iterator, Optional, Union, cast
+from PIL import Image, ImageOps
 
-from .cli_parsers import existing_file_type
+from .cli_parsers import probed_image_type
+from .crop import CENTER_FOCUS, CropStrategy, Focus, find_focus, get_focus, make_proxy
 from .desktop_protocol import ImageMode
+from .probe import (
+    BUFFER_TYPES,
+    EncodedSource,
+    ImageInfo,
+    InvalidImageError,
+    SourceFile,
+    image_info,
+    open_encoded,
+    probe_image,
+    probe_source,
+)
 
 
 DESTINATION = Path(__file__).parent.joinpath("processed")
 
+# Formats that can be handed to the desktop backend without re-encoding.
+PASSTHROUGH_FORMATS = frozenset({"BMP", "JPEG", "PNG"})
+
+# Colour of the bars added around the image in FIT mode.
+FIT_BACKGROUND = (0, 0, 0)
+
+
+class Passthrough(Enum):
+    """How a source that needs no pixel work is handed out by process_image."""
+
+    DIRECT = "direct"  # return the source path itself
+    LINK = "link"  # hard-link into DESTINATION, copying if linking fails
+    COPY = "copy"  # copy into DESTINATION
+
+
+@dataclass(frozen=True)
+class ProcessOptions:
+    """Processing settings that apply to any source and target."""
+
+    passthrough: Passthrough = Passthrough.DIRECT  # process_image only
+    image_format: str = "PNG"  # encoding of rendered output
+    crop_strategy: CropStrategy = CropStrategy.CENTER  # FILL mode only
+    # FIT mode only: output just the scaled image, for backends that letterbox
+    # it themselves.
+    os_scaling: bool = False
+
+
+@dataclass
+class ProcessingStats:
+    """
+    Counts of process_image/process_buffer calls that handed out the encoded
+    source as-is (passthrough) and of calls that decoded and re-encoded it
+    (rendered).
+    """
+
+    passthrough: int = 0
+    rendered: int = 0
+
+    def reset(self) -> None:
+        self.passthrough = 0
+        self.rendered = 0
+
+
+PROCESSING_STATS = ProcessingStats()
+
+
+# Anything render_image accepts: encoded data, a PIL image or an array exposing
+# the NumPy array interface (e.g. numpy.ndarray).
+ImageSource = Union[
+    EncodedSource, SourceFile, Image.Image, Image.SupportsArrayInterface
+]
+
 
 def process_stretch(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
     """Resize the image to exactly fill target dimensions (stretch mode)."""
     return img.resize(target_size)
 
 
+def fit_size(
+    image_size: tuple[int, int], target_size: tuple[int, int]
+) -> tuple[int, int]:
+    """Largest size with the image's aspect ratio that fits within the target."""
+    width, height = image_size
+    target_width, target_height = target_size
+    ratio = min(target_width / width, target_height / height)
+    return int(width * ratio), int(height * ratio)
+
+
+def process_fit_unpadded(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
+    """
+    Resize the image to fit within target dimensions (keeping aspect ratio)
+    without padding, leaving the letterboxing to the desktop backend.
+    """
+    return img.resize(fit_size(img.size, target_size), Image.Resampling.LANCZOS)
+
+
 def process_fit(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
     """
     Resize the image to fit within target dimensions (keeping aspect ratio),
     and then center it on a black background.
     """
     target_width, target_height = target_size
-    width_ratio = target_width / img.width
-    height_ratio = target_height / img.height
-    ratio = min(width_ratio, height_ratio)
-    new_width = int(img.width * ratio)
-    new_height = int(img.height * ratio)
-
-    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    new_img = Image.new("RGB", target_size, (0, 0, 0))  # Black background
+    resized = process_fit_unpadded(img, target_size)
+    new_width, new_height = resized.size
+    new_img = Image.new("RGB", target_size, FIT_BACKGROUND)
     x = (target_width - new_width) // 2
     y = (target_height - new_height) // 2
     new_img.paste(resized, (x, y))
     return new_img
 
 
-def process_fill(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
+def _crop_offset(length: int, window: int, focus: float) -> float:
+    """Start of a window centred on `focus` (relative), kept within `length`."""
+    return min(max(focus * length - window / 2, 0), length - window)
+
+
+def process_fill(
+    img: Image.Image, target_size: tuple[int, int], focus: Focus = CENTER_FOCUS
+) -> Image.Image:
     """
     Resize the image such that it completely fills the target dimensions
     (keeping aspect ratio), then crop the excess.
+
+    The crop window is centred on `focus`, given in relative coordinates of the
+    image, as far as the image bounds allow.
     """
     target_width, target_height = target_size
     img_ratio = img.width / img.height
@@ -53,37 +146,252 @@ def process_fill(img: Image.Image, target_size: tuple[int, int]) -> Image.Image:
         new_height = int(img.height * (new_width / img.width))
 
     resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    left = (resized.width - target_width) / 2
-    top = (resized.height - target_height) / 2
+    left = _crop_offset(resized.width, target_width, focus[0])
+    top = _crop_offset(resized.height, target_height, focus[1])
     right = left + target_width
     bottom = top + target_height
     return resized.crop((left, top, right, bottom))
 
 
-def process_image(
-    source_path: Path, target_width: int, target_height: int, mode: ImageMode
-) -> Path:
-    """Process image to fit the target resolution based on the specified mode."""
-    img = Image.open(source_path)
+def needs_pixel_work(
+    info: ImageInfo,
+    target_size: tuple[int, int],
+    mode: ImageMode,
+    os_scaling: bool = False,
+) -> bool:
+    """Return False if rendering would reproduce the source pixels unchanged."""
+    if os_scaling and mode == ImageMode.FIT:
+        target_size = fit_size(info.upright_size, target_size)
+    if info.size != target_size or not info.is_upright():
+        return True
+    # FIT always renders onto an RGB canvas, so only RGB sources are identical.
+    return mode == ImageMode.FIT and info.mode != "RGB"
+
+
+def needs_processing(
+    info: ImageInfo,
+    target_size: tuple[int, int],
+    mode: ImageMode,
+    os_scaling: bool = False,
+) -> bool:
+    """Return False if the encoded source can be used as-is for the given target."""
+    if info.format not in PASSTHROUGH_FORMATS:
+        return True
+    return needs_pixel_work(info, target_size, mode, os_scaling)
+
+
+def open_image(source: ImageSource) -> Image.Image:
+    """
+    Get a PIL image from any supported source.
+
+    Encoded sources are opened lazily, so pixel data is decoded on first use.
+
+    Raises:
+        InvalidImageError: If an encoded source is not a readable image.
+        TypeError: If the source is of an unsupported type.
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, SourceFile):
+        return open_encoded(source.encoded())
+    if isinstance(source, (Path, *BUFFER_TYPES)) or hasattr(source, "read"):
+        return open_encoded(cast(EncodedSource, source))
+    if hasattr(source, "__array_interface__"):
+        return Image.fromarray(source)
+    raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+
+def _fill_focus(
+    source: ImageSource,
+    img: Image.Image,
+    target_size: tuple[int, int],
+    strategy: CropStrategy,
+) -> Focus:
+    """Crop focus for FILL mode; cached only for files."""
+    if strategy == CropStrategy.CENTER:
+        return CENTER_FOCUS
+    if isinstance(source, Path):
+        return get_focus(source, target_size, strategy)
+    if isinstance(source, SourceFile):
+        return get_focus(source.path, target_size, strategy, source.data)
+    return find_focus(make_proxy(img), target_size[0] / target_size[1], strategy)
+
+
+def render_image(
+    source: ImageSource,
+    target_width: int,
+    target_height: int,
+    mode: ImageMode,
+    options: ProcessOptions = ProcessOptions(),
+) -> Image.Image:
+    """
+    Render an image for the target resolution in memory.
+
+    Sources with an EXIF orientation are rotated upright first. If no pixel
+    work is needed the (upright) source image itself is returned. Smart crop
+    focus points are cached only for file sources. A SourceFile's probed
+    header is reused.
+
+    Raises:
+        InvalidImageError: If an encoded source is not a readable image.
+        TypeError: If the source is of an unsupported type.
+    """
+    img = open_image(source)
     target_size = (target_width, target_height)
+    try:
+        info = source.info if isinstance(source, SourceFile) else image_info(img)
+        if not info.is_upright():
+            # Apply the EXIF rotation, the rendered output carries no orientation.
+            img = ImageOps.exif_transpose(img)
+            info = image_info(img)
+        img.load()
+    except OSError as err:  # e.g. truncated data
+        raise InvalidImageError(f"Image data could not be decoded: {err}") from err
 
+    if not needs_pixel_work(info, target_size, mode, options.os_scaling):
+        return img
     if mode == ImageMode.STRETCH:
-        processed_img = process_stretch(img, target_size)
-    elif mode == ImageMode.FIT:
-        processed_img = process_fit(img, target_size)
-    elif mode == ImageMode.FILL:
-        processed_img = process_fill(img, target_size)
+        return process_stretch(img, target_size)
+    if mode == ImageMode.FIT and options.os_scaling:
+        return process_fit_unpadded(img, target_size).convert("RGB")
+    if mode == ImageMode.FIT:
+        return process_fit(img, target_size)
+    if mode == ImageMode.FILL:
+        focus = _fill_focus(source, img, target_size, options.crop_strategy)
+        return process_fill(img, target_size, focus)
+    raise ValueError(f"Unsupported mode: {mode}")
+
+
+def encode_image(img: Image.Image, image_format: str = "PNG") -> bytes:
+    """Encode an image into an in-memory buffer."""
+    buffer = BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def process_buffer(
+    data: Union[bytes, bytearray, memoryview],
+    target_width: int,
+    target_height: int,
+    mode: ImageMode,
+    options: ProcessOptions = ProcessOptions(),
+) -> Union[bytes, bytearray, memoryview]:
+    """
+    Process an encoded image entirely in memory and return the encoded result.
+
+    If the buffer is already in `options.image_format` and needs no pixel
+    work, it is returned unchanged without being decoded.
+
+    Raises:
+        InvalidImageError: If the buffer is not a readable image.
+    """
+    info = probe_image(data)
+    target_size = (target_width, target_height)
+    if info.format == options.image_format and not needs_processing(
+        info, target_size, mode, options.os_scaling
+    ):
+        PROCESSING_STATS.passthrough += 1
+        return data
+    img = render_image(data, target_width, target_height, mode, options)
+    PROCESSING_STATS.rendered += 1
+    return encode_image(img, options.image_format)
+
+
+def place_passthrough(
+    source_path: Path,
+    output_path: Path,
+    passthrough: Passthrough,
+    data: Optional[bytes] = None,
+) -> Path:
+    """
+    Hand out an unprocessed source according to the passthrough strategy.
+
+    A copy is written from `data` if the source content was already loaded.
+    """
+    if passthrough == Passthrough.DIRECT:
+        return source_path
+    output_path.unlink(missing_ok=True)
+    if passthrough == Passthrough.LINK:
+        try:
+            os.link(source_path, output_path)
+            return output_path
+        except OSError:
+            pass  # e.g. different volume or no hard-link support, fall back
+    if data is not None:
+        output_path.write_bytes(data)
     else:
-        raise ValueError(f"Unsupported mode: {mode}")
+        shutil.copyfile(source_path, output_path)
+    return output_path
 
-    output_path = (
-        DESTINATION
-        / f"{mode.name} {target_width}x{target_height} {source_path.stem}.png"
-    )
-    processed_img.save(output_path)
+
+def process_image(
+    source: Union[Path, SourceFile],
+    target_width: int,
+    target_height: int,
+    mode: ImageMode,
+    options: ProcessOptions = ProcessOptions(),
+) -> Path:
+    """
+    Process image to fit the target resolution based on the specified mode.
+
+    The source header is probed first. If the image already matches the target
+    and needs no pixel work, it is not decoded at all and is handed out
+    according to `options.passthrough` instead. In FILL mode
+    `options.crop_strategy` selects how the crop window is placed. With
+    `options.os_scaling`, FIT mode produces only the scaled image without bars.
+    A SourceFile is not probed again, and if it carries the file content
+    (see process_batch) the file is not read again either. Otherwise
+    the source is rendered with render_image and saved in
+    `options.image_format`.
+
+    Raises:
+        InvalidImageError: If the source is not a readable image.
+    """
+    source = probe_source(source)
+    source_path, info = source.path, source.info
+    target_size = (target_width, target_height)
+    strategy = options.crop_strategy
+    suffix = "" if strategy == CropStrategy.CENTER else f" {strategy.value}"
+    if options.os_scaling and mode == ImageMode.FIT:
+        suffix = " os"
+    prefix = f"{mode.name}{suffix} {target_width}x{target_height}"
+
+    if not needs_processing(info, target_size, mode, options.os_scaling):
+        PROCESSING_STATS.passthrough += 1
+        output_path = DESTINATION / f"{prefix} {source_path.name}"
+        return place_passthrough(
+            source_path, output_path, options.passthrough, source.data
+        )
+
+    processed_img = render_image(source, target_width, target_height, mode, options)
+    PROCESSING_STATS.rendered += 1
+    extension = options.image_format.lower()
+    output_path = DESTINATION / f"{prefix} {source_path.stem}.{extension}"
+    processed_img.save(output_path, format=options.image_format)
     return output_path
 
 
+def process_batch(
+    sources: Iterable[tuple[Path, bytes]],
+    target_width: int,
+    target_height: int,
+    mode: ImageMode,
+    options: ProcessOptions = ProcessOptions(),
+) -> Iterator[Path]:
+    """
+    Process already loaded source files, yielding each output path in order.
+
+    Feed it from loader.prefetch so that storage latency overlaps with
+    decoding, e.g. `process_batch(prefetch(paths), 1920, 1080, mode)`.
+
+    Raises:
+        InvalidImageError: If a source is not a readable image.
+    """
+    for source_path, data in sources:
+        source = SourceFile(source_path, probe_image(data), data)
+        yield process_image(source, target_width, target_height, mode, options)
+
+
 def image_mode_parse(arg: str) -> ImageMode:
     return ImageMode[arg.upper()]
 
@@ -92,7 +400,7 @@ def main() -> None:
     """CLI entry point for testing image processing"""
     parser = argparse.ArgumentParser(description="Test image processing for wallpapers")
     parser.add_argument(
-        "source", type=existing_file_type, help="Path to source image file"
+        "source", type=probed_image_type, help="Path to source image file"
     )
     parser.add_argument("width", type=int, help="Target width in pixels")
     parser.add_argument("height", type=int, help="Target height in pixels")
@@ -103,12 +411,36 @@ def main() -> None:
         help="Processing mode: FILL, FIT, STRETCH",
     )
     parser.add_argument("-o", "--output", help=f"Output path (default: {DESTINATION})")
+    parser.add_argument(
+        "--passthrough",
+        type=Passthrough,
+        choices=list(Passthrough),
+        default=Passthrough.COPY,
+        help="How to hand out sources that need no processing (default: copy)",
+    )
+    parser.add_argument(
+        "--crop",
+        type=CropStrategy,
+        choices=list(CropStrategy),
+        default=CropStrategy.CENTER,
+        help="Crop window placement for FILL mode (default: center)",
+    )
 
     args = parser.parse_args()
 
     # Process image
-    result_path = process_image(args.source, args.width, args.height, args.mode)
+    result_path = process_image(
+        args.source,
+        args.width,
+        args.height,
+        args.mode,
+        ProcessOptions(passthrough=args.passthrough, crop_strategy=args.crop),
+    )
     print(f"Processed image saved to: {result_path}")
+    print(
+        f"Passthrough: {PROCESSING_STATS.passthrough}, "
+        f"rendered: {PROCESSING_STATS.rendered}"
+    )
 
 
 if __name__ == "__main__":
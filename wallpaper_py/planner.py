@@ -0,0 +1,194 @@
+"""
+Render planning: decide per apply whether to render the final wallpaper in
+Python or to let the desktop backend do the scaling.
+
+In FIT mode a full render is mostly letterbox bars. If the backend supports
+FIT positioning, it can be handed just the scaled image and a background
+colour instead, which produces the same result with fewer pixels processed
+and written. Where the position or background colour is global, this is
+only done if it cannot change what the other monitors show.
+"""
+
+from dataclasses import dataclass, replace
+from enum import Enum
+from pathlib import Path
+from typing import Optional, Union
+
+from .desktop_protocol import (
+    Color,
+    DesktopManager,
+    ImageMode,
+    MonitorDescription,
+    UnsupportedModeError,
+)
+from .image import (
+    FIT_BACKGROUND,
+    ProcessOptions,
+    fit_size,
+    needs_processing,
+    process_image,
+)
+from .probe import (
+    ImageInfo,
+    InvalidImageError,
+    SourceFile,
+    probe_image,
+    probe_source,
+)
+
+
+@dataclass
+class PlannerStats:
+    """Pixels written by applied plans, and pixels OS rendering avoided."""
+
+    os_rendered: int = 0
+    python_rendered: int = 0
+    pixels_written: int = 0
+    pixels_saved: int = 0
+
+    def reset(self) -> None:
+        self.os_rendered = 0
+        self.python_rendered = 0
+        self.pixels_written = 0
+        self.pixels_saved = 0
+
+
+PLANNER_STATS = PlannerStats()
+
+
+class Renderer(Enum):
+    PYTHON = "python"  # render the final monitor-size image
+    OS = "os"  # write the scaled image only, backend positions and pads it
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    renderer: Renderer
+    mode: ImageMode
+    target_size: tuple[int, int]
+    output_size: tuple[int, int]
+    # Set only for OS rendering: the backend state the plan relies on.
+    position: Optional[ImageMode] = None
+    background: Optional[Color] = None
+
+    def pixels(self) -> int:
+        """Number of pixels processed and written by the plan."""
+        return self.output_size[0] * self.output_size[1]
+
+    def pixels_saved(self) -> int:
+        """Pixels a full monitor-size render would have written in addition."""
+        return self.target_size[0] * self.target_size[1] - self.pixels()
+
+
+def _matches_monitor(wallpaper: Path, monitor_description: MonitorDescription) -> bool:
+    """True if the wallpaper looks the same under any position and background."""
+    rect = monitor_description.rect
+    try:
+        info = probe_image(wallpaper)
+    except InvalidImageError:
+        return False
+    return info.is_upright() and info.size == (rect.get_width(), rect.get_height())
+
+
+def _others_unaffected(
+    manager: DesktopManager, monitor_description: MonitorDescription
+) -> bool:
+    """True if global position/background changes leave other monitors as-is."""
+    return all(
+        _matches_monitor(
+            monitor.wallpaper_settings.wallpaper, monitor.monitor_description
+        )
+        for monitor in manager.get_monitors()
+        if monitor.monitor_description != monitor_description
+    )
+
+
+def _global_state_matches(manager: DesktopManager) -> bool:
+    """True if the global settings OS rendering needs are already in place."""
+    if manager.get_background_color() != FIT_BACKGROUND:
+        return False
+    if manager.is_mode_per_monitor_supported():
+        return True  # the position is set with the wallpaper, per monitor
+    try:
+        mode = manager.get_global_mode()
+    except UnsupportedModeError:
+        return False
+    return mode == ImageMode.FIT
+
+
+def plan_render(
+    manager: DesktopManager,
+    monitor_description: MonitorDescription,
+    info: ImageInfo,
+    mode: ImageMode,
+) -> RenderPlan:
+    """
+    Choose how to render an image with the given header for a monitor.
+
+    OS rendering is chosen for FIT mode when the image does not already
+    cover the monitor, the backend supports FIT, and switching the global
+    settings to the ones FIT rendering uses does not change any other monitor.
+    Those are the background colour and, unless the backend sets modes per
+    monitor, the position.
+    """
+    rect = monitor_description.rect
+    target_size = (rect.get_width(), rect.get_height())
+    full = RenderPlan(Renderer.PYTHON, mode, target_size, target_size)
+    if mode != ImageMode.FIT or ImageMode.FIT not in manager.get_supported_modes():
+        return full
+    scaled_size = fit_size(info.upright_size, target_size)
+    if scaled_size == target_size:
+        return full
+    if not _global_state_matches(manager) and not _others_unaffected(
+        manager, monitor_description
+    ):
+        return full
+    return RenderPlan(
+        Renderer.OS,
+        mode,
+        target_size,
+        scaled_size,
+        position=ImageMode.FIT,
+        background=FIT_BACKGROUND,
+    )
+
+
+def apply_plan(
+    manager: DesktopManager,
+    monitor_description: MonitorDescription,
+    source: Union[Path, SourceFile],
+    plan: RenderPlan,
+    options: ProcessOptions = ProcessOptions(),
+) -> Path:
+    """Render the source according to the plan and set it as the wallpaper."""
+    source = probe_source(source)
+    options = replace(options, os_scaling=plan.renderer == Renderer.OS)
+    image = process_image(source, *plan.target_size, plan.mode, options)
+    if plan.renderer == Renderer.OS:
+        PLANNER_STATS.os_rendered += 1
+    else:
+        PLANNER_STATS.python_rendered += 1
+    if needs_processing(source.info, plan.target_size, plan.mode, options.os_scaling):
+        PLANNER_STATS.pixels_written += plan.pixels()
+    PLANNER_STATS.pixels_saved += plan.pixels_saved()
+    if plan.background is not None:
+        manager.set_background_color(plan.background)
+    manager.set_wallpaper(monitor_description, image, mode=plan.position)
+    return image
+
+
+def render_wallpaper(
+    manager: DesktopManager,
+    monitor_description: MonitorDescription,
+    source: Union[Path, SourceFile],
+    mode: ImageMode,
+    options: ProcessOptions = ProcessOptions(),
+) -> Path:
+    """
+    Plan and apply a wallpaper change for one monitor.
+
+    A Path source is probed once, a SourceFile's header is reused.
+    """
+    source = probe_source(source)
+    plan = plan_render(manager, monitor_description, source.info, mode)
+    return apply_plan(manager, monitor_description, source, plan, options)
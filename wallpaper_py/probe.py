@@ -0,0 +1,147 @@
+"""
+Header-only image probing.
+
+Opening an image with Pillow only parses the file header; pixel data is not
+decoded until it is accessed. This module uses that to validate inputs and
+to decide up front whether any pixel work is needed at all.
+"""
+
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Optional, Union, cast
+
+from PIL import ExifTags, Image
+
+# EXIF orientation value meaning "stored as displayed".
+NORMAL_ORIENTATION = 1
+# EXIF orientations that rotate or transpose by 90°, swapping width and height.
+TRANSPOSED_ORIENTATIONS = frozenset({5, 6, 7, 8})
+# In-memory buffers holding a whole encoded image.
+BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+# Anything holding an encoded (not yet decoded) image.
+EncodedSource = Union[Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+class InvalidImageError(ValueError): ...
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    format: str
+    size: tuple[int, int]
+    mode: str
+    orientation: int = NORMAL_ORIENTATION
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def upright_size(self) -> tuple[int, int]:
+        """Size of the image as displayed, after applying its orientation."""
+        if self.orientation in TRANSPOSED_ORIENTATIONS:
+            return self.height, self.width
+        return self.size
+
+    def is_upright(self) -> bool:
+        """True if the pixels are stored the way they should be displayed."""
+        return self.orientation == NORMAL_ORIENTATION
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    """An image file with its probed header, and its content if already read."""
+
+    path: Path
+    info: ImageInfo
+    data: Optional[bytes] = None
+
+    def encoded(self) -> EncodedSource:
+        """The loaded content if available, otherwise the path."""
+        return self.path if self.data is None else self.data
+
+
+def read_orientation(img: Image.Image) -> int:
+    """Return the EXIF orientation found in the image header."""
+    if img.format == "PNG" and "exif" not in img.info:
+        # An eXIf chunk after the pixel data is only found by decoding the
+        # whole image, which getexif() would do. Treat such files as upright.
+        return NORMAL_ORIENTATION
+    return int(img.getexif().get(ExifTags.Base.Orientation, NORMAL_ORIENTATION))
+
+
+def image_info(img: Image.Image) -> ImageInfo:
+    """Describe an opened image; only header data is accessed."""
+    image_format: Optional[str] = img.format
+    return ImageInfo(
+        format=image_format or "",
+        size=img.size,
+        mode=img.mode,
+        orientation=read_orientation(img),
+    )
+
+
+def source_name(source: EncodedSource) -> str:
+    """Describe an encoded source in error messages."""
+    return str(source) if isinstance(source, Path) else "buffer"
+
+
+def open_encoded(source: EncodedSource) -> Image.Image:
+    """
+    Lazily open an encoded image from a path, a buffer or a binary file.
+
+    Raises:
+        InvalidImageError: If the source cannot be identified as an image.
+    """
+    try:
+        if isinstance(source, BUFFER_TYPES):
+            return Image.open(BytesIO(source))
+        return Image.open(source)
+    except OSError as err:  # includes PIL.UnidentifiedImageError
+        raise InvalidImageError(
+            f"{source_name(source)} is not a readable image!"
+        ) from err
+
+
+def probe_image(source: EncodedSource) -> ImageInfo:
+    """
+    Read format, dimensions, mode and EXIF orientation without decoding pixels.
+
+    File objects are rewound to their original position afterwards.
+
+    Raises:
+        InvalidImageError: If the source cannot be identified as an image.
+    """
+    name = source_name(source)
+    position = None
+    if not isinstance(source, (Path, *BUFFER_TYPES)):
+        position = source.tell()
+    try:
+        with open_encoded(source) as img:
+            info = image_info(img)
+    except OSError as err:  # e.g. a corrupt EXIF block
+        raise InvalidImageError(f"{name} is not a readable image!") from err
+    finally:
+        if position is not None:
+            cast(BinaryIO, source).seek(position)
+    if info.width <= 0 or info.height <= 0:
+        raise InvalidImageError(f"{name} has invalid size {info.size}!")
+    return info
+
+
+def probe_source(source: Union[Path, SourceFile]) -> SourceFile:
+    """
+    Probe an image file, unless it is a SourceFile that was already probed.
+
+    Raises:
+        InvalidImageError: If the file cannot be identified as an image.
+    """
+    if isinstance(source, SourceFile):
+        return source
+    return SourceFile(source, probe_image(source))
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Iterable, Optional, Sequence
 from pathlib import Path
 from wallpaper_py.desktop_protocol import (
+    Color,
     Monitor as MonitorProtocol,
     MonitorDescription as MonitorDescriptionProtocol,
     DesktopManager as DesktopManagerProtocol,
@@ -116,3 +117,12 @@ class DesktopManager(DesktopManagerProtocol):
 
     def get_global_mode(self) -> ImageMode:
         return self.get_mode(self.__dw.get_position())
+
+    def set_background_color(self, color: Color) -> None:
+        red, green, blue = color
+        # COLORREF layout: 0x00BBGGRR
+        self.__dw.set_background_color(red | green << 8 | blue << 16)
+
+    def get_background_color(self) -> Color:
+        value = self.__dw.get_background_color()
+        return (value & 0xFF, value >> 8 & 0xFF, value >> 16 & 0xFF)
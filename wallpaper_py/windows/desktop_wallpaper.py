@@ -115,3 +115,6 @@ class IDesktopWallpaper(IUnknown):  # type: ignore[misc]
         self.__com_GetBackgroundColor(pointer(dword))
         assert dword.value is not None
         return dword.value
+
+    def set_background_color(self, color: int) -> None:
+        self.__com_SetBackgroundColor(DWORD(color))